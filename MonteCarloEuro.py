@@ -1,65 +1,175 @@
+import os
 import math
 import numpy as np
 import pandas as pd
 import datetime
 import scipy.stats as stats
+from scipy.special import ndtri
 import matplotlib.pyplot as plt
 from pandas_datareader import data as pdr
+from concurrent.futures import ThreadPoolExecutor
+from pricing import bs_price, normal_pdf
+
+# Optional numba kernel; fall back to NumPy when numba isn't installed
+try:
+    from numba_kernels import mc_kernel
+except ImportError:
+    mc_kernel = None
+
+# Optional numexpr for the fused drift/diffusion/exp pass when numba isn't installed
+try:
+    import numexpr as ne
+except ImportError:
+    ne = None
+
+# Optional GPU backend; the NumPy path below runs unchanged on CuPy arrays
+try:
+    import cupy as cp
+except ImportError:
+    cp = None
+
+# Shared PCG64 generator (faster than the legacy global RandomState)
+rng = np.random.default_rng()
+
+# Sum and sum of squares of the pair-averaged payoffs over `half` antithetic
+# pairs drawn from `gen`; `xp` is NumPy on the CPU or CuPy on the GPU
+def price_chunk(xp, gen, half, lnS, nudt, volsdt, sqrtN, N, K, is_call):
+    # One normal Z per terminal price, with -Z as its antithetic partner
+    ST = xp.empty(2 * half, dtype=np.float32)
+    gen.standard_normal(half, dtype=np.float32, out=ST[:half])
+    xp.negative(ST[:half], out=ST[half:])
+    if xp is np and ne is not None:
+        # numexpr evaluates the whole expression blockwise in a single pass
+        ne.evaluate("exp(mu + sd * ST)", out=ST,
+                    local_dict={'mu': lnS + N * nudt, 'sd': sqrtN * volsdt, 'ST': ST})
+    else:
+        ST *= sqrtN * volsdt
+        ST += lnS + N * nudt
+        xp.exp(ST, out=ST)
+
+    # Compute the payoffs based on option type
+    if is_call:
+        CT = xp.maximum(0, ST - K)
+    else:
+        CT = xp.maximum(0, K - ST)
 
-def monte_carlo_option_pricing(S, K, vol, r, N, M, market_value, start_date, end_date, option_type):
+    # Average each antithetic pair (the i.i.d. sample) in float64 for the sums
+    CT = xp.add(CT[:half], CT[half:], dtype=np.float64)
+    CT *= 0.5
+
+    # Single pass over CT: np.dot forms sum(x^2) without a squared temporary
+    return float(xp.sum(CT)), float(xp.dot(CT, CT))
+
+def monte_carlo_option_pricing(S, K, vol, r, N, M, market_value, start_date, end_date, option_type, use_gpu=False, use_qmc=False):
     # Calculate the time to maturity in years
     T = (end_date - start_date).days / 365.0
     print(f"Time to maturity (T) is: {T} years")
 
-    # Precompute constants
+    # The log-price and sqrt(T) need positive prices and a non-negative maturity
+    if S <= 0 or K <= 0 or T < 0:
+        print("Please use a positive asset price and strike, and an end date on or after the start date.")
+        return
+
+    # Precompute constants (math on Python floats skips NumPy's 0-d dispatch)
     dt = T / N
-    nudt = (r - 0.5 * vol**2) * dt
-    volsdt = vol * np.sqrt(dt)
-    lnS = np.log(S)
-
-    # Monte Carlo Method
-    Z = np.random.normal(size=(N, M))
-    delta_lnSt = nudt + volsdt * Z
-    lnSt = lnS + np.cumsum(delta_lnSt, axis=0)
-    lnSt = np.concatenate((np.full(shape=(1, M), fill_value=lnS), lnSt))
-
-    # Compute Expectation and SE based on option type
-    ST = np.exp(lnSt)
-    if option_type.lower() == 'call':
-        CT = np.maximum(0, ST[-1] - K)
-    elif option_type.lower() == 'put':
-        CT = np.maximum(0, K - ST[-1])
-    else:
+    nudt = np.float32((r - 0.5 * vol**2) * dt)
+    volsdt = np.float32(vol * math.sqrt(dt))
+    lnS = np.float32(math.log(S))
+    sqrtN = np.float32(math.sqrt(N))
+    disc = math.exp(-r * T)
+
+    if option_type.lower() not in ('call', 'put'):
         print("Invalid option type. Please choose 'call' or 'put'.")
         return
+    is_call = option_type.lower() == 'call'
 
-    C0 = np.exp(-r * T) * np.sum(CT) / M
+    # Antithetic sampling prices M // 2 pairs, and the SE needs at least two
+    if M < 4:
+        print("Please use at least 4 simulations (2 antithetic pairs).")
+        return
 
-    sigma = np.sqrt(np.sum((CT - C0)**2) / (M - 1))
-    SE = sigma / np.sqrt(M)
+    if use_gpu and cp is None:
+        print("CuPy is not installed, running on the CPU instead.")
+        use_gpu = False
+
+    if use_qmc:
+        # Randomized quasi-Monte Carlo: after collapsing to the terminal price each
+        # path needs one normal, so a 1-d scrambled Sobol' sequence mapped through
+        # the normal inverse CDF replaces the pseudo-random draws. One Sobol' set
+        # has no valid sample SE, so R independently scrambled sets of 2^m points
+        # are priced and the SE is taken from the spread of their estimates
+        R = 16
+        m = math.ceil(math.log2(max(M / R, 2)))
+        estimates = np.empty(R)
+        for i in range(R):
+            u = stats.qmc.Sobol(d=1, scramble=True, seed=rng).random_base2(m).ravel()
+            Z = ndtri(u).astype(np.float32)
+            ST = np.exp(lnS + N * nudt + sqrtN * volsdt * Z)
+            CT = np.maximum(0, ST - K) if is_call else np.maximum(0, K - ST)
+            estimates[i] = disc * np.mean(CT, dtype=np.float64)
+
+        print(f"Using {R} Sobol' sets of {2**m} points ({R * 2**m} paths)")
+        C0 = np.mean(estimates)
+        SE = np.std(estimates, ddof=1) / math.sqrt(R)
+    elif mc_kernel is not None and not use_gpu:
+        # Fused, multi-threaded kernel (see numba_kernels.py)
+        C0, SE = mc_kernel(S, K, r, T, nudt, volsdt, N, M, is_call)
+    else:
+        half = M // 2
+        if use_gpu:
+            # The same array code runs on the GPU through CuPy
+            sums = [price_chunk(cp, cp.random.default_rng(), half, lnS, nudt, volsdt, sqrtN, N, K, is_call)]
+        else:
+            # NumPy releases the GIL while sampling, in exp and in the reductions,
+            # so the pairs are split across a thread pool, each chunk drawing
+            # from its own spawned stream
+            workers = min(os.cpu_count() or 1, half)
+            sizes = [half // workers + (i < half % workers) for i in range(workers)]
+            # The pool already uses every core, so numexpr runs single-threaded
+            # inside each chunk instead of starting its own threads
+            if ne is not None:
+                ne_threads = ne.set_num_threads(1)
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                sums = list(ex.map(lambda gen, n: price_chunk(np, gen, n, lnS, nudt, volsdt, sqrtN, N, K, is_call),
+                                   rng.spawn(workers), sizes))
+            if ne is not None:
+                ne.set_num_threads(ne_threads)
+
+        # Reduce the chunks. var = (sum(x^2) - sum(x)^2 / n) / (n - 1) can round
+        # slightly below zero when the payoffs barely vary, so it is clamped at 0
+        sum_payoff = sum(s for s, _ in sums)
+        sum_payoff_sq = sum(s2 for _, s2 in sums)
+        C0 = disc * sum_payoff / half
+
+        sigma = disc * math.sqrt(max(sum_payoff_sq - sum_payoff * sum_payoff / half, 0.0) / (half - 1))
+        SE = sigma / math.sqrt(half)
 
     print(f"{option_type.capitalize()} value is ${np.round(C0, 2)} with SE +/- ${np.round(SE, 2)}")
 
+    # Vanilla European options have an exact analytic price; the simulation
+    # above is kept for the SE and the distribution plot
+    print(f"Black-Scholes {option_type.lower()} value is ${np.round(bs_price(S, K, r, vol, T, is_call), 2)}")
+
     # Plotting the results
-    x1 = np.linspace(C0 - 3 * SE, C0 - 1 * SE, 100)
-    x2 = np.linspace(C0 - 1 * SE, C0 + 1 * SE, 100)
-    x3 = np.linspace(C0 + 1 * SE, C0 + 3 * SE, 100)
+    # One curve over +/- 3 SE; the 1 StDev band is shaded by masking it
+    x = np.linspace(C0 - 3 * SE, C0 + 3 * SE, 300)
+    s = normal_pdf(x, C0, SE)
+    within = np.abs(x - C0) <= SE
 
-    s1 = stats.norm.pdf(x1, C0, SE)
-    s2 = stats.norm.pdf(x2, C0, SE)
-    s3 = stats.norm.pdf(x3, C0, SE)
+    # Draw on an explicit Figure so repeated calls don't pile onto pyplot's global state
+    fig, ax = plt.subplots()
 
-    plt.fill_between(x1, s1, color='tab:blue', label='> StDev')
-    plt.fill_between(x2, s2, color='cornflowerblue', label='1 StDev')
-    plt.fill_between(x3, s3, color='tab:blue')
+    ax.fill_between(x, s, where=~within, interpolate=True, color='tab:blue', label='> StDev')
+    ax.fill_between(x, s, where=within, interpolate=True, color='cornflowerblue', label='1 StDev')
 
-    plt.plot([C0, C0], [0, max(s2) * 1.1], 'k', label='Theoretical Value')
-    plt.plot([market_value, market_value], [0, max(s2) * 1.1], 'r', label='Market Value')
+    ax.plot([C0, C0], [0, s.max() * 1.1], 'k', label='Theoretical Value')
+    ax.plot([market_value, market_value], [0, s.max() * 1.1], 'r', label='Market Value')
 
-    plt.ylabel("Probability")
-    plt.xlabel("Option Price")
-    plt.legend()
+    ax.set_ylabel("Probability")
+    ax.set_xlabel("Option Price")
+    ax.legend()
     plt.show()
+    plt.close(fig)
 
 # Prompt the user for input values
 option_type = input("Enter the option type ('call' or 'put'): ")
@@ -70,6 +180,8 @@ r = float(input("Enter the risk-free rate (% as a decimal): "))
 N = int(input("Enter the number of time steps (N): "))
 M = int(input("Enter the number of simulations (M): "))
 market_value = float(input("Enter the market price of the option: "))
+use_gpu = input("Run the simulation on the GPU if CuPy is available? (y/n): ").strip().lower() == 'y'
+use_qmc = input("Use Sobol' quasi-random sampling instead? (y/n): ").strip().lower() == 'y'
 
 # Prompt the user for start and end dates
 start_year = int(input("Enter the start year (YYYY): "))
@@ -83,4 +195,4 @@ start_date = datetime.date(start_year, start_month, start_day)
 end_date = datetime.date(end_year, end_month, end_day)
 
 # Call the function with the user inputs
-monte_carlo_option_pricing(S, K, vol, r, N, M, market_value, start_date, end_date, option_type)
+monte_carlo_option_pricing(S, K, vol, r, N, M, market_value, start_date, end_date, option_type, use_gpu, use_qmc)
@@ -0,0 +1,82 @@
+import math
+import numpy as np
+from numba import njit, prange
+
+# Undiscounted payoff averaged over the antithetic pair (z, -z)
+@njit(fastmath=True, cache=True)
+def _pair_payoff(mean, diffusion, z, K, is_call):
+    ST_plus = math.exp(mean + diffusion * z)
+    ST_minus = math.exp(mean - diffusion * z)
+    if is_call:
+        return 0.5 * (max(ST_plus - K, 0.0) + max(ST_minus - K, 0.0))
+    return 0.5 * (max(K - ST_plus, 0.0) + max(K - ST_minus, 0.0))
+
+# Fused Monte Carlo price and SE over M // 2 antithetic pairs; each iteration
+# draws two Box-Muller normals and prices two pairs into per-thread sums
+@njit(parallel=True, fastmath=True, cache=True)
+def mc_kernel(S, K, r, T, nudt, volsdt, N, M, is_call):
+    mean = math.log(S) + N * nudt
+    diffusion = math.sqrt(N) * volsdt
+    half = M // 2
+
+    sum_payoff = 0.0
+    sum_payoff_sq = 0.0
+    for m in prange(half // 2):
+        radius = math.sqrt(-2.0 * math.log(1.0 - np.random.random()))
+        theta = 2.0 * math.pi * np.random.random()
+        payoff_a = _pair_payoff(mean, diffusion, radius * math.cos(theta), K, is_call)
+        payoff_b = _pair_payoff(mean, diffusion, radius * math.sin(theta), K, is_call)
+        sum_payoff += payoff_a + payoff_b
+        sum_payoff_sq += payoff_a * payoff_a + payoff_b * payoff_b
+
+    # An odd number of pairs leaves one pair for a single normal
+    if half % 2:
+        payoff = _pair_payoff(mean, diffusion, np.random.standard_normal(), K, is_call)
+        sum_payoff += payoff
+        sum_payoff_sq += payoff * payoff
+
+    # The SE needs at least two pairs; callers reject M < 4 up front
+    if half < 2:
+        return math.nan, math.nan
+
+    # Discounted price and standard error of the discounted payoff
+    disc = math.exp(-r * T)
+    C0 = disc * sum_payoff / half
+    # The variance can round slightly below zero when the payoffs barely vary
+    sigma = disc * math.sqrt(max(sum_payoff_sq - sum_payoff * sum_payoff / half, 0.0) / (half - 1))
+    return C0, sigma / math.sqrt(half)
+
+# Fused call/put payoff pass over simulated terminal prices (used by the
+# Streamlit app): one prange sweep writes both payoff arrays and accumulates
+# the sums and sums of squares behind the prices and SEs. PT - CT = K - ST,
+# so the put payoff is derived from the call payoff on each path.
+# ST holds antithetic pairs (ST[m], ST[m + M // 2]); the pair-averaged payoff
+# is the i.i.d. sample, so the sums are over the M // 2 pair averages.
+@njit(parallel=True, fastmath=True, cache=True)
+def payoff_kernel(ST, K):
+    half = ST.shape[0] // 2
+    CT = np.empty_like(ST)
+    PT = np.empty_like(ST)
+
+    sum_call = 0.0
+    sum_call_sq = 0.0
+    sum_put = 0.0
+    sum_put_sq = 0.0
+    for m in prange(half):
+        diff_plus = ST[m] - K
+        diff_minus = ST[m + half] - K
+        call_plus = max(diff_plus, 0.0)
+        call_minus = max(diff_minus, 0.0)
+        CT[m] = call_plus
+        CT[m + half] = call_minus
+        PT[m] = call_plus - diff_plus
+        PT[m + half] = call_minus - diff_minus
+
+        call = 0.5 * (call_plus + call_minus)
+        put = call - 0.5 * (diff_plus + diff_minus)
+        sum_call += call
+        sum_call_sq += call * call
+        sum_put += put
+        sum_put_sq += put * put
+
+    return CT, PT, sum_call, sum_call_sq, sum_put, sum_put_sq
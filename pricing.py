@@ -0,0 +1,25 @@
+import math
+import numpy as np
+from scipy.special import ndtr
+
+# Helpers shared by the CLI pricer and the Streamlit app
+
+# Closed-form Black-Scholes price of a European call or put. With no volatility
+# or no time to maturity the price is the discounted intrinsic value; inputs
+# outside the model's domain give NaN
+def bs_price(S, K, r, vol, T, is_call):
+    if S <= 0 or K <= 0 or T < 0:
+        return math.nan
+    disc_K = K * math.exp(-r * T)
+    vol_sqrtT = vol * math.sqrt(T)
+    if vol_sqrtT == 0:
+        return max(S - disc_K, 0.0) if is_call else max(disc_K - S, 0.0)
+    d1 = (math.log(S / K) + (r + 0.5 * vol * vol) * T) / vol_sqrtT
+    d2 = d1 - vol_sqrtT
+    if is_call:
+        return S * ndtr(d1) - disc_K * ndtr(d2)
+    return disc_K * ndtr(-d2) - S * ndtr(-d1)
+
+# Gaussian density evaluated directly, without scipy's generic distribution machinery
+def normal_pdf(x, mu, sigma):
+    return np.exp(-0.5 * ((x - mu) / sigma)**2) / (sigma * np.sqrt(2 * np.pi))
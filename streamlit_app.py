@@ -1,8 +1,23 @@
+import math
 import streamlit as st
 import numpy as np
 import datetime
 import plotly.graph_objs as go
-import scipy.stats as stats
+from scipy.special import ndtri
+from scipy.stats import qmc
+from pricing import bs_price, normal_pdf
+
+# Optional numba kernel for the payoff pass; the app falls back to NumPy without it
+try:
+    from numba_kernels import payoff_kernel
+except ImportError:
+    payoff_kernel = None
+
+# Optional GPU backend for the simulation; the app falls back to NumPy without it
+try:
+    import cupy as cp
+except ImportError:
+    cp = None
 
 #######################
 # Page configuration
@@ -55,51 +70,193 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Monte Carlo Simulation Function with Greeks Calculation
-def monte_carlo_option_pricing_with_greeks(S, K, vol, r, N, M, market_value, start_date, end_date):
-    # Calculate the time to maturity in years
-    T = (end_date - start_date).days / 365.0
-    st.write(f"Time to maturity (T) is: {T:.4f} years")
+# Distribution curve over +/- 3 SE around a price, cached on (C0, SE) so reruns
+# that only move the market value line don't rebuild it
+@st.cache_data(max_entries=32, ttl=3600)
+def gaussian_curve(C0, SE):
+    x = np.linspace(C0 - 3 * SE, C0 + 3 * SE, 300)
+    return x, normal_pdf(x, C0, SE)
 
-    # Precompute constants
-    dt = T / N
-    nudt = (r - 0.5 * vol**2) * dt
-    volsdt = vol * np.sqrt(dt)
-    lnS = np.log(S)
+# Plotly figures, cached on the values they draw so reruns that don't change
+# them (e.g. toggling the plot type back) skip building the traces and layout
+@st.cache_data(max_entries=32, ttl=3600)
+def distribution_figure(C0, SE_call, P0, SE_put, market_value):
+    x_call, y_call = gaussian_curve(C0, SE_call)
+    x_put, y_put = gaussian_curve(P0, SE_put)
 
-    # Monte Carlo Method
-    Z = np.random.normal(size=(N, M))
-    delta_lnSt = nudt + volsdt * Z
-    lnSt = lnS + np.cumsum(delta_lnSt, axis=0)
-    lnSt = np.concatenate((np.full(shape=(1, M), fill_value=lnS), lnSt))
+    fig = go.Figure()
+
+    # Call Option Plot
+    fig.add_trace(go.Scatter(x=x_call, y=y_call, mode='lines', name='Call Option', line=dict(color='#4CAF50', width=2)))
+
+    # Put Option Plot
+    fig.add_trace(go.Scatter(x=x_put, y=y_put, mode='lines', name='Put Option', line=dict(color='#F44336', width=2)))
+
+    # Vertical Lines
+    fig.add_vline(x=C0, line=dict(color='#4CAF50', dash='dash'), annotation_text='Call Value', annotation_position='top right')
+    fig.add_vline(x=P0, line=dict(color='#F44336', dash='dash'), annotation_text='Put Value', annotation_position='top left')
+    fig.add_vline(x=market_value, line=dict(color='#2196F3'), annotation_text='Market Value', annotation_position='top right')
+
+    # Improving the aesthetics
+    fig.update_layout(title='Option Pricing Distribution',xaxis_title='Option Price',
+                      yaxis_title='Probability Density',
+                      legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01, traceorder="normal"),
+                      template='plotly_white',
+                      margin=dict(l=50, r=50, t=50, b=50))
 
-    # Simulated paths for ST
-    ST = np.exp(lnSt)
-    
-    # Compute Expectation and SE for Call Option
-    CT = np.maximum(0, ST[-1] - K)
-    C0 = np.exp(-r * T) * np.sum(CT) / M
+    # Update annotations to avoid overlap
+    fig.update_annotations(dict(font_size=12, arrowcolor="rgba(0,0,0,0)"))
 
-    # Compute Expectation and SE for Put Option
-    PT = np.maximum(0, K - ST[-1])
-    P0 = np.exp(-r * T) * np.sum(PT) / M
+    return fig
 
-    # Calculate Standard Errors
-    sigma_call = np.sqrt(np.sum((CT - C0)**2) / (M - 1))
-    SE_call = sigma_call / np.sqrt(M)
+@st.cache_data(max_entries=32, ttl=3600)
+def breakeven_figure(ST, CT, PT, market_value):
+    fig = go.Figure()
 
-    sigma_put = np.sqrt(np.sum((PT - P0)**2) / (M - 1))
-    SE_put = sigma_put / np.sqrt(M)
+    # Break-Even Plot for Call Option
+    fig.add_trace(go.Scatter(x=ST, y=CT, mode='markers', name="Call Option", marker=dict(color='#4CAF50')))
+
+    # Break-Even Plot for Put Option
+    fig.add_trace(go.Scatter(x=ST, y=PT, mode='markers', name="Put Option", marker=dict(color='#F44336')))
+
+    fig.add_hline(y=market_value, line=dict(color='#2196F3', dash='dash'), annotation_text='Market Value', annotation_position='top right')
+
+    fig.update_layout(title='Break-Even Analysis', xaxis_title='Underlying Asset Price', yaxis_title='Option Payoff',
+                      legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01, traceorder="normal"),
+                      template='plotly_white',
+                      margin=dict(l=50, r=50, t=50, b=50))
+
+    return fig
+
+# Number of independently scrambled Sobol' sets in the quasi-Monte Carlo mode
+QMC_SETS = 16
+
+# Monte Carlo simulation of the terminal prices, cached on the inputs that
+# shape the sample so that editing K or the market value re-prices the same
+# paths instead of re-sampling them. The returned length-M float32 ST is the
+# single sample behind the prices, SEs, ITM/OTM counts, break-even points,
+# Greeks, the distribution plot and the payoff scatter
+@st.cache_data(max_entries=32, ttl=3600)
+def simulate_terminal_prices(S, vol, r, N, M, T, seed, use_gpu=False, use_qmc=False):
+    # The same array code runs on the GPU through CuPy or on the CPU through NumPy
+    xp = cp if use_gpu else np
+
+    # Precompute constants
+    dt = T / N
+    nudt = np.float32((r - 0.5 * vol**2) * dt)
+    volsdt = np.float32(vol * math.sqrt(dt))
+    lnS = np.float32(math.log(S))
+    sqrtN = np.float32(math.sqrt(N))
+
+    # Monte Carlo Method
+    # Only the terminal prices are used, and the sum of the N i.i.d. N(0, 1)
+    # increments is N(0, N), so each path needs a single normal Z. Z is also
+    # returned so the Greeks can reuse it as common random numbers.
+    # Antithetic variates: M // 2 draws fill the first half of Z and their
+    # negations the second half, so path m is paired with path m + M // 2
+    if use_qmc:
+        # Randomized quasi-Monte Carlo: Z is QMC_SETS independently scrambled
+        # 1-d Sobol' sets of 2^m points, laid out back to back and mapped
+        # through the normal inverse CDF. The SE is taken from the spread of
+        # the per-set estimates (see _qmc_price)
+        m = math.ceil(math.log2(max(M / QMC_SETS, 2)))
+        u = np.concatenate([qmc.Sobol(d=1, scramble=True, seed=gen).random_base2(m).ravel()
+                            for gen in np.random.default_rng(seed).spawn(QMC_SETS)])
+        Z = xp.asarray(ndtri(u), dtype=np.float32)
+    else:
+        rng = xp.random.default_rng(seed)
+        half = M // 2
+        Z = xp.empty(2 * half, dtype=np.float32)
+        rng.standard_normal(half, dtype=np.float32, out=Z[:half])
+        xp.negative(Z[:half], out=Z[half:])
+
+    # Simulated terminal prices ST, built in place in one buffer
+    ST = Z * (sqrtN * volsdt)
+    ST += lnS + N * nudt
+    xp.exp(ST, out=ST)
+
+    if use_gpu:
+        return cp.asnumpy(Z), cp.asnumpy(ST)
+    return Z, ST
+
+# Call and put payoffs on the simulated ST. PT - CT = K - ST on every path, so
+# the put payoff is derived from the call payoff in the difference's buffer
+def _payoffs(ST, K):
+    diff = ST - K
+    CT = np.maximum(diff, 0)
+    PT = np.subtract(CT, diff, out=diff)
+    return CT, PT
+
+# Sum and sum of squares of the antithetic pair-averaged payoffs, which are the
+# i.i.d. samples. The averages are formed in float64 so that both sums
+# accumulate in float64; np.dot avoids a squared temporary
+def _payoff_sums(payoff):
+    half = len(payoff) // 2
+    pair = np.add(payoff[:half], payoff[half:], dtype=np.float64)
+    pair *= 0.5
+    return np.sum(pair), float(np.dot(pair, pair))
+
+# Discounted price and SE from the payoff sums of n i.i.d. samples. The variance
+# can round slightly below zero when the payoffs barely vary, so it is clamped
+def _price(sum_payoff, sum_payoff_sq, n, r, T):
+    disc = math.exp(-r * T)
+    price = disc * sum_payoff / n
+
+    sigma = disc * math.sqrt(max(sum_payoff_sq - sum_payoff * sum_payoff / n, 0.0) / (n - 1))
+    return price, sigma / math.sqrt(n)
+
+# Discounted price and SE of a randomized QMC sample: QMC_SETS scrambled
+# Sobol' sets back to back, each giving one independent estimate
+def _qmc_price(payoff, r, T):
+    estimates = math.exp(-r * T) * payoff.reshape(QMC_SETS, -1).mean(axis=1, dtype=np.float64)
+    return estimates.mean(), estimates.std(ddof=1) / math.sqrt(QMC_SETS)
+
+# Monte Carlo Simulation Function with Greeks Calculation. It has no Streamlit
+# side effects, so the whole result is cached on the pricing inputs; the market
+# value only affects the display and is not part of the key
+@st.cache_data(max_entries=32, ttl=3600)
+def monte_carlo_option_pricing_with_greeks(S, K, vol, r, N, M, T, seed, use_gpu=False, use_qmc=False):
+    disc = math.exp(-r * T)
+
+    Z, ST = simulate_terminal_prices(S, vol, r, N, M, T, seed, use_gpu, use_qmc)
+    # An odd M simulates M - 1 paths (M // 2 antithetic pairs), and the QMC
+    # mode rounds M up to QMC_SETS sets of a power of two
+    M = len(ST)
+
+    # Compute Expectation and SE for Call and Put Options
+    if use_qmc:
+        CT, PT = _payoffs(ST, K)
+        C0, SE_call = _qmc_price(CT, r, T)
+        P0, SE_put = _qmc_price(PT, r, T)
+    else:
+        if payoff_kernel is not None:
+            # Fused, multi-threaded payoff pass (see numba_kernels.py)
+            CT, PT, sum_call, sum_call_sq, sum_put, sum_put_sq = payoff_kernel(ST, K)
+        else:
+            CT, PT = _payoffs(ST, K)
+            sum_call, sum_call_sq = _payoff_sums(CT)
+            sum_put, sum_put_sq = _payoff_sums(PT)
+        C0, SE_call = _price(sum_call, sum_call_sq, M // 2, r, T)
+        P0, SE_put = _price(sum_put, sum_put_sq, M // 2, r, T)
+
+    # Exact analytic prices for comparison with the Monte Carlo estimates
+    bs_call = bs_price(S, K, r, vol, T, True)
+    bs_put = bs_price(S, K, r, vol, T, False)
+
+    # ITM masks, computed once and shared by the break-even points, the
+    # ITM/OTM counts and the Greeks
+    itm_call = ST > K
+    itm_put = ST < K
 
     # Simple Break-Even Data
-    breakeven_call = np.mean(ST[-1][ST[-1] > K])
-    breakeven_put = np.mean(ST[-1][ST[-1] < K])
+    breakeven_call = np.mean(ST[itm_call], dtype=np.float64)
+    breakeven_put = np.mean(ST[itm_put], dtype=np.float64)
 
     # Calculate ITM and OTM counts
-    itm_calls = np.sum(ST[-1] > K)
-    otm_calls = np.sum(ST[-1] <= K)
-    itm_puts = np.sum(ST[-1] < K)
-    otm_puts = np.sum(ST[-1] >= K)
+    itm_calls = np.count_nonzero(itm_call)
+    otm_calls = M - itm_calls
+    itm_puts = np.count_nonzero(itm_put)
+    otm_puts = M - itm_puts
 
     # Calculate ITM and OTM as percentages
     itm_calls_pct = itm_calls / M * 100
@@ -108,63 +265,49 @@ def monte_carlo_option_pricing_with_greeks(S, K, vol, r, N, M, market_value, sta
     otm_puts_pct = otm_puts / M * 100
 
     # Greeks Calculation
-    delta_call = np.mean(ST[-1] > K)  # ∆ Call (approximated by the proportion of paths that end up ITM)
-    delta_put = np.mean(ST[-1] < K)   # ∆ Put (approximated by the proportion of paths that end up ITM)
-    
-    # Gamma can be approximated as the change in Delta for a small change in S
-    epsilon = S * 0.01
-    ST_up = ST * np.exp(volsdt)
-    ST_down = ST * np.exp(-volsdt)
-    
-    delta_call_up = np.mean(ST_up[-1] > K)
-    delta_call_down = np.mean(ST_down[-1] > K)
-    
-    gamma_call = (delta_call_up - delta_call_down) / (2 * epsilon)
-    gamma_put = gamma_call  # Gamma is the same for calls and puts
-
-    # Vega is approximated by rerunning the simulation with slightly higher volatility
-    volsdt_up = (vol + epsilon) * np.sqrt(dt)
-    lnSt_up = lnS + np.cumsum(nudt + volsdt_up * Z, axis=0)
-    ST_up_vol = np.exp(lnSt_up)
-
-    CT_up_vol = np.maximum(0, ST_up_vol[-1] - K)
-    C0_up_vol = np.exp(-r * T) * np.sum(CT_up_vol) / M
-    vega_call = (C0_up_vol - C0) / epsilon
-
-    PT_up_vol = np.maximum(0, K - ST_up_vol[-1])
-    P0_up_vol = np.exp(-r * T) * np.sum(PT_up_vol) / M
-    vega_put = (P0_up_vol - P0) / epsilon
-
-    # Theta is approximated by rerunning the simulation with a slightly shorter maturity
-    T_down = T - dt
-    lnSt_down = lnS + np.cumsum(nudt * (T_down/T) + volsdt * np.sqrt(T_down/T) * Z, axis=0)
-    ST_down = np.exp(lnSt_down)
-
-    CT_down = np.maximum(0, ST_down[-1] - K)
-    C0_down = np.exp(-r * T_down) * np.sum(CT_down) / M
-    theta_call = (C0_down - C0) / dt
-
-    PT_down = np.maximum(0, K - ST_down[-1])
-    P0_down = np.exp(-r * T_down) * np.sum(PT_down) / M
-    theta_put = (P0_down - P0) / dt
-
-    # Rho is approximated by rerunning the simulation with a slightly higher interest rate
-    r_up = r + epsilon
-    nudt_up = (r_up - 0.5 * vol**2) * dt
-    lnSt_up = lnS + np.cumsum(nudt_up + volsdt * Z, axis=0)
-    ST_up = np.exp(lnSt_up)
-
-    CT_up = np.maximum(0, ST_up[-1] - K)
-    C0_up = np.exp(-r_up * T) * np.sum(CT_up) / M
-    rho_call = (C0_up - C0) / epsilon
-
-    PT_up = np.maximum(0, K - ST_up[-1])
-    P0_up = np.exp(-r_up * T) * np.sum(PT_up) / M
-    rho_put = (P0_up - P0) / epsilon
+    # Pathwise estimators from the pricing sample itself, so no extra simulations
+    # are needed. With ST = S * exp((r - vol^2/2) T + vol sqrt(T) Z):
+    #   dST/dS = ST / S, dST/dvol = ST (sqrt(T) Z - vol T),
+    #   dST/dT = ST ((r - vol^2/2) + vol Z / (2 sqrt(T)))
+    # and the payoff derivative is 1 (call) or -1 (put) on the ITM paths
+    sqrtT = math.sqrt(T)
+
+    if vol * sqrtT == 0:
+        # No diffusion: the option is worth its discounted intrinsic value, so use
+        # its Greeks (the LR and pathwise weights divide by vol * sqrt(T))
+        call_itm = S > K * disc
+        put_itm = S < K * disc
+        delta_call = 1.0 if call_itm else 0.0
+        delta_put = -1.0 if put_itm else 0.0
+        gamma_call = gamma_put = 0.0
+        vega_call = vega_put = 0.0
+        theta_call = -r * K * disc if call_itm else 0.0
+        theta_put = r * K * disc if put_itm else 0.0
+    else:
+        delta_call = disc * np.mean(ST * itm_call, dtype=np.float64) / S
+        delta_put = -disc * np.mean(ST * itm_put, dtype=np.float64) / S
+
+        # Gamma: the payoff has no second derivative, so use the likelihood-ratio weight
+        lr_weight = (Z * Z - 1) / (S * S * vol * vol * T) - Z / (S * S * vol * sqrtT)
+        gamma_call = disc * np.mean(CT * lr_weight, dtype=np.float64)
+        gamma_put = gamma_call  # Gamma is the same for calls and puts
+
+        dST_dvol = ST * (sqrtT * Z - vol * T)
+        vega_call = disc * np.mean(dST_dvol * itm_call, dtype=np.float64)
+        vega_put = -disc * np.mean(dST_dvol * itm_put, dtype=np.float64)
+
+        # Theta = -dV/dT = r V - disc * E[payoff'(ST) dST/dT]
+        dST_dT = ST * ((r - 0.5 * vol * vol) + vol * Z / (2 * sqrtT))
+        theta_call = r * C0 - disc * np.mean(dST_dT * itm_call, dtype=np.float64)
+        theta_put = r * P0 + disc * np.mean(dST_dT * itm_put, dtype=np.float64)
+
+    # Rho = -T V + disc * E[payoff'(ST) T ST], which reduces to +/- disc T K P(ITM)
+    rho_call = disc * T * K * itm_calls / M
+    rho_put = -disc * T * K * itm_puts / M
 
     return (C0, SE_call, P0, SE_put, itm_calls_pct, otm_calls_pct, itm_puts_pct, otm_puts_pct, 
             delta_call, delta_put, gamma_call, gamma_put, vega_call, vega_put, theta_call, theta_put, rho_call, rho_put, 
-            breakeven_call, breakeven_put, ST, CT, PT)
+            breakeven_call, breakeven_put, bs_call, bs_put, ST, CT, PT)
 
 # Sidebar for User Inputs
 st.sidebar.title("📊 Monte Carlo Model")
@@ -172,21 +315,29 @@ st.sidebar.write("`Created by:`")
 linkedin_url = "www.linkedin.com/in/khaled-sahbi-161329200"
 st.sidebar.markdown(f'<a href="{linkedin_url}" target="_blank" style="text-decoration: none; color: inherit;"><img src="https://cdn-icons-png.flaticon.com/512/174/174857.png" width="25" height="25" style="vertical-align: middle; margin-right: 10px;">`Khaled Sahbi`</a>', unsafe_allow_html=True)
 
-# Using expanders to make the interface less compact
-with st.sidebar.expander("Option Parameters", expanded=True):
-    S = st.number_input("Current Asset Price", value=100.0)
-    K = st.number_input("Strike Price", value=100.0)
-    vol = st.number_input("Volatility (σ)", value=0.2)
-    r = st.number_input("Risk-Free Interest Rate", value=0.03)
-
-with st.sidebar.expander("Simulation Parameters", expanded=False):
-    N = st.number_input("Number of Time Steps (N)", value=252, step=1)
-    M = st.number_input("Number of Simulations (M)", value=1000, step=100)
-    market_value = st.number_input("Market Value of Option", value=7.5)
-
-with st.sidebar.expander("Dates", expanded=False):
-    start_date = st.date_input("Start Date", datetime.date(2024, 1, 1))
-    end_date = st.date_input("End Date", datetime.date(2025, 1, 1))
+# Inputs are collected in a form so that editing them doesn't rerun the
+# simulation until the user submits
+with st.sidebar.form("params"):
+    # Using expanders to make the interface less compact
+    with st.expander("Option Parameters", expanded=True):
+        S = st.number_input("Current Asset Price", value=100.0)
+        K = st.number_input("Strike Price", value=100.0)
+        vol = st.number_input("Volatility (σ)", value=0.2)
+        r = st.number_input("Risk-Free Interest Rate", value=0.03)
+
+    with st.expander("Simulation Parameters", expanded=False):
+        N = st.number_input("Number of Time Steps (N)", value=252, step=1)
+        M = st.number_input("Number of Simulations (M)", min_value=4, value=1000, step=100)
+        market_value = st.number_input("Market Value of Option", value=7.5)
+        seed = st.number_input("Random Seed", min_value=0, value=42, step=1)
+        use_gpu = st.checkbox("Use GPU", value=False)
+        use_qmc = st.checkbox("Use Sobol' quasi-random sampling", value=False)
+
+    with st.expander("Dates", expanded=False):
+        start_date = st.date_input("Start Date", datetime.date(2024, 1, 1))
+        end_date = st.date_input("End Date", datetime.date(2025, 1, 1))
+
+    submitted = st.form_submit_button("Run simulation")
 
 # Add a dropdown to select which plot to display
 plot_type = st.selectbox("Select Plot Type", ["Option Pricing Distribution", "Break-Even Analysis"])
@@ -194,11 +345,29 @@ plot_type = st.selectbox("Select Plot Type", ["Option Pricing Distribution", "Br
 # Main Page for Output Display
 st.title("Monte Carlo Pricing Model with Greeks")
 
-# Calculate Call and Put values using Monte Carlo simulation
-results = monte_carlo_option_pricing_with_greeks(S, K, vol, r, N, M, market_value, start_date, end_date)
+# Fall back to the CPU when CuPy isn't available
+if use_gpu and cp is None:
+    st.warning("CuPy is not installed, running the simulation on the CPU instead.")
+    use_gpu = False
+
+# Calculate the time to maturity in years
+T = (end_date - start_date).days / 365.0
+st.write(f"Time to maturity (T) is: {T:.4f} years")
+
+# The log-price and sqrt(T) need positive prices and a non-negative maturity
+if S <= 0 or K <= 0 or T < 0:
+    st.error("Please use a positive asset price and strike, and an end date on or after the start date.")
+    st.stop()
+
+# Calculate Call and Put values using Monte Carlo simulation. This only runs on
+# submit (or first load); other reruns, e.g. switching the plot type, reuse the
+# results kept in the session state
+if submitted or "results" not in st.session_state:
+    st.session_state["results"] = monte_carlo_option_pricing_with_greeks(S, K, vol, r, N, M, T, seed, use_gpu, use_qmc)
+results = st.session_state["results"]
 (C0, SE_call, P0, SE_put, itm_calls_pct, otm_calls_pct, itm_puts_pct, otm_puts_pct, 
  delta_call, delta_put, gamma_call, gamma_put, vega_call, vega_put, theta_call, theta_put, rho_call, rho_put, 
- breakeven_call, breakeven_put, ST, CT, PT) = results
+ breakeven_call, breakeven_put, bs_call, bs_put, ST, CT, PT) = results
 
 # Display Call and Put Values with Standard Errors in colored tables
 col1, col2 = st.columns(2)
@@ -213,6 +382,7 @@ with col1:
         </div>
     """, unsafe_allow_html=True)
 
+    st.write(f"**Black-Scholes Value (Call):** ${bs_call:.2f}")
     st.write(f"**Break-Even Point (Call):** ${breakeven_call:.2f}")
 
 with col2:
@@ -225,6 +395,7 @@ with col2:
         </div>
     """, unsafe_allow_html=True)
 
+    st.write(f"**Black-Scholes Value (Put):** ${bs_put:.2f}")
     st.write(f"**Break-Even Point (Put):** ${breakeven_put:.2f}")
 
 # ITM and OTM details in an expander
@@ -254,51 +425,7 @@ with st.expander("Greeks Call & Put Value Calculations", expanded=False):
 
 # Display the selected plot type
 if plot_type == "Option Pricing Distribution":
-    x_call = np.linspace(C0 - 3 * SE_call, C0 + 3 * SE_call, 100)
-    y_call = stats.norm.pdf(x_call, C0, SE_call)
-
-    x_put = np.linspace(P0 - 3 * SE_put, P0 + 3 * SE_put, 100)
-    y_put = stats.norm.pdf(x_put, P0, SE_put)
-
-    fig = go.Figure()
-
-    # Call Option Plot
-    fig.add_trace(go.Scatter(x=x_call, y=y_call, mode='lines', name='Call Option', line=dict(color='#4CAF50', width=2)))
-
-    # Put Option Plot
-    fig.add_trace(go.Scatter(x=x_put, y=y_put, mode='lines', name='Put Option', line=dict(color='#F44336', width=2)))
-
-    # Vertical Lines
-    fig.add_vline(x=C0, line=dict(color='#4CAF50', dash='dash'), annotation_text='Call Value', annotation_position='top right')
-    fig.add_vline(x=P0, line=dict(color='#F44336', dash='dash'), annotation_text='Put Value', annotation_position='top left')
-    fig.add_vline(x=market_value, line=dict(color='#2196F3'), annotation_text='Market Value', annotation_position='top right')
-
-    # Improving the aesthetics
-    fig.update_layout(title='Option Pricing Distribution',xaxis_title='Option Price',
-                      yaxis_title='Probability Density',
-                      legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01, traceorder="normal"),
-                      template='plotly_white',
-                      margin=dict(l=50, r=50, t=50, b=50))
-
-    # Update annotations to avoid overlap
-    fig.update_annotations(dict(font_size=12, arrowcolor="rgba(0,0,0,0)"))
-
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(distribution_figure(C0, SE_call, P0, SE_put, market_value), use_container_width=True)
 
 elif plot_type == "Break-Even Analysis":
-    fig = go.Figure()
-
-    # Break-Even Plot for Call Option
-    fig.add_trace(go.Scatter(x=ST[-1], y=CT, mode='markers', name="Call Option", marker=dict(color='#4CAF50')))
-
-    # Break-Even Plot for Put Option
-    fig.add_trace(go.Scatter(x=ST[-1], y=PT, mode='markers', name="Put Option", marker=dict(color='#F44336')))
-
-    fig.add_hline(y=market_value, line=dict(color='#2196F3', dash='dash'), annotation_text='Market Value', annotation_position='top right')
-
-    fig.update_layout(title='Break-Even Analysis', xaxis_title='Underlying Asset Price', yaxis_title='Option Payoff',
-                      legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01, traceorder="normal"),
-                      template='plotly_white',
-                      margin=dict(l=50, r=50, t=50, b=50))
-
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(breakeven_figure(ST, CT, PT, market_value), use_container_width=True)